@@ -1,6 +1,14 @@
 import streamlit as st
-from cloud_main import main_tender_agent
+from cloud_main import (
+    NEXT_STEPS,
+    TenderSearchError,
+    generate_application_summary_stream,
+    main_tender_agent,
+    parse_user_profile,
+)
+import asyncio
 import os
+import requests
 from dotenv import load_dotenv
 
 # Set page configuration
@@ -11,6 +19,26 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def iterate_sync(agen, loop):
+    """Drive an async generator from Streamlit's synchronous script, one item at a time."""
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+
+def close_loop(loop):
+    """Cancel whatever is still in flight on the loop, then close it."""
+    # Cancel tender analyses still in flight if rendering stopped early
+    pending = asyncio.all_tasks(loop)
+    for task in pending:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.close()
+
 # Ensure environment variables are loaded
 script_dir = os.path.dirname(os.path.abspath(__file__))
 dotenv_path = os.path.join(script_dir, '.env')
@@ -21,11 +49,29 @@ if not os.getenv("OPENROUTER_API_KEY"):
     st.error("⚠️ OpenRouter API key not found. Please make sure your .env file contains OPENROUTER_API_KEY.")
     st.stop()
 
-# Set up the sidebar
-st.sidebar.title("🤖 Government Tender Agent")
-st.sidebar.image("https://img.icons8.com/color/96/000000/government.png", width=100)
-st.sidebar.markdown("---")
-st.sidebar.markdown("""
+SIDEBAR_ICON_URL = "https://img.icons8.com/color/96/000000/government.png"
+
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def _icon(url: str) -> bytes:
+    """Fetch the sidebar icon once a day instead of on every rerun; errors propagate so they are not cached."""
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return response.content
+
+def _sidebar_icon():
+    """Return the cached icon bytes, or the URL for the browser to load if the fetch failed."""
+    try:
+        return _icon(SIDEBAR_ICON_URL)
+    except requests.RequestException:
+        return SIDEBAR_ICON_URL
+
+@st.cache_data(show_spinner=False)
+def render_sidebar(icon):
+    """Render the static sidebar; Streamlit replays the cached elements on reruns."""
+    st.sidebar.title("🤖 Government Tender Agent")
+    st.sidebar.image(icon, width=100)
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("""
 ## About
 This AI agent helps companies find relevant government tenders and assess eligibility.
 
@@ -35,16 +81,19 @@ This AI agent helps companies find relevant government tenders and assess eligib
 - Generate application summaries
 - Provide next steps
 """)
-st.sidebar.markdown("---")
-st.sidebar.markdown("### How to use")
-st.sidebar.markdown("""
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### How to use")
+    st.sidebar.markdown("""
 1. Enter your company details
 2. Include industry and location information
 3. Add any specific keywords or requirements
 4. Submit and wait for results
 """)
-st.sidebar.markdown("---")
-st.sidebar.info("Powered by Claude 3 Sonnet via OpenRouter")
+    st.sidebar.markdown("---")
+    st.sidebar.info("Powered by Claude 3 Sonnet via OpenRouter")
+
+# Set up the sidebar
+render_sidebar(_sidebar_icon())
 
 # Main content
 st.title("🎯 Government Tender AI Agent")
@@ -78,77 +127,73 @@ user_input = st.text_area(
 
 search_button = st.button("🔍 Find Tenders")
 
+def render_tender_expander(result, user_profile, loop):
+    """Display one analyzed tender, streaming its application summary."""
+    tender = result["tender"]
+    eligibility = result["eligibility"]
+    
+    with st.expander(f"Tender {result['number']}: {tender['title']}", expanded=True):
+        # Create columns for tender info
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Source", tender["source"])
+        col2.metric("Match Score", f"{eligibility.get('match_score', 'N/A')}%")
+        col3.metric("Deadline", tender.get("deadline", "Check Portal"))
+        
+        st.markdown(f"**Eligibility:** {'✅ Eligible' if eligibility.get('eligible') else '❌ Not Eligible'}")
+        st.markdown(f"**Reasons:** {', '.join(eligibility.get('reasons', ['Review required']))}")
+        
+        # The summary materializes token by token as OpenRouter streams it
+        st.markdown("#### Application Summary")
+        # Same loop as the analyses, so the stream shares their concurrency limit
+        st.write_stream(iterate_sync(generate_application_summary_stream(result["parsed"], user_profile), loop))
+        
+        st.markdown(f"[Visit Tender Portal]({tender['link']})")
+
 # Process and display results
 if search_button and user_input:
-    with st.spinner("🔄 Searching for relevant tenders... This may take a minute."):
-        try:
-            # Save the input to session state
-            st.session_state.user_input = user_input
-            
-            # Call the main tender agent function
-            result = main_tender_agent(user_input)
-            
-            # Display results in a nicely formatted way
-            st.markdown("## 📋 Results")
-            
-            # Display company profile section
-            if "TENDER SEARCH RESULTS FOR:" in result:
-                profile_section = result.split("TENDER SEARCH RESULTS FOR:")[1].split("\n\n")[0]
-                st.markdown(f"### Company Profile")
-                st.info(f"**{profile_section.strip()}**")
-            
-            # Parse and display each tender in its own expander
-            tenders = result.split("TENDER ")[1:]
-            if tenders:
-                st.markdown("### 📊 Matching Tenders")
-                
-                for i, tender in enumerate(tenders):
-                    tender_num = i + 1
-                    tender_title = tender.split("\n")[0].split(":")[1].strip() if ":" in tender.split("\n")[0] else "Tender"
+    loop = asyncio.new_event_loop()
+    try:
+        # Save the input to session state
+        st.session_state.user_input = user_input
+        
+        found = False
+        
+        # Each tender renders as soon as its analysis completes; eligibility is
+        # needed up front, so only the application summary is streamed
+        with st.spinner("🔄 Searching for relevant tenders..."):
+            for result in iterate_sync(main_tender_agent(user_input, include_summary=False), loop):
+                if not found:
+                    found = True
+                    user_profile = parse_user_profile(user_input)
+                    
+                    # Display results in a nicely formatted way
+                    st.markdown("## 📋 Results")
                     
-                    with st.expander(f"Tender {tender_num}: {tender_title}", expanded=True):
-                        tender_details = "TENDER " + tender.strip()
-                        
-                        # Extract various tender sections
-                        source = tender_details.split("SOURCE:")[1].split("\n")[0].strip() if "SOURCE:" in tender_details else "N/A"
-                        link = tender_details.split("LINK:")[1].split("\n")[0].strip() if "LINK:" in tender_details else "#"
-                        match_score = tender_details.split("MATCH SCORE:")[1].split("\n")[0].strip() if "MATCH SCORE:" in tender_details else "N/A"
-                        deadline = tender_details.split("DEADLINE:")[1].split("\n")[0].strip() if "DEADLINE:" in tender_details else "N/A"
-                        eligibility = "✅ Eligible" if "✅ Eligible" in tender_details else "❌ Not Eligible"
-                        
-                        # Create columns for tender info
-                        col1, col2, col3 = st.columns(3)
-                        col1.metric("Source", source)
-                        col2.metric("Match Score", match_score)
-                        col3.metric("Deadline", deadline)
-                        
-                        st.markdown(f"**Eligibility:** {eligibility}")
-                        
-                        if "REASONS:" in tender_details:
-                            reasons = tender_details.split("REASONS:")[1].split("\n\n")[0].strip()
-                            st.markdown(f"**Reasons:** {reasons}")
-                        
-                        if "APPLICATION SUMMARY:" in tender_details:
-                            summary = tender_details.split("APPLICATION SUMMARY:")[1].split("---")[0].strip()
-                            st.markdown("#### Application Summary")
-                            st.text_area("", value=summary, height=200, key=f"summary_{i}")
-                        
-                        st.markdown(f"[Visit Tender Portal]({link})")
+                    # Display company profile section
+                    st.markdown(f"### Company Profile")
+                    st.info(
+                        f"**{user_profile.get('company_name') or 'Your Company'}**  \n"
+                        f"Industry: {user_profile.get('industry') or 'N/A'}  \n"
+                        f"Location: {user_profile.get('location') or 'N/A'}"
+                    )
+                    st.markdown("### 📊 Matching Tenders")
                 
-                # Display next steps if available
-                if "NEXT STEPS:" in result:
-                    next_steps = result.split("NEXT STEPS:")[1].strip()
-                    st.markdown("### 📝 Next Steps")
-                    steps = next_steps.split("\n")
-                    for step in steps:
-                        if step.strip():
-                            st.markdown(f"- {step.strip()}")
-            else:
-                st.warning("No eligible tenders found matching your profile.")
+                render_tender_expander(result, user_profile, loop)
         
-        except Exception as e:
-            st.error(f"Error: {str(e)}")
-            st.error("Please try again with more specific company details.")
+        if found:
+            st.markdown("### 📝 Next Steps")
+            for step in NEXT_STEPS:
+                st.markdown(f"- {step}")
+        else:
+            st.warning("No eligible tenders found matching your profile.")
+    
+    except TenderSearchError as e:
+        st.warning(str(e))
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+        st.error("Please try again with more specific company details.")
+    finally:
+        close_loop(loop)
 
 # Add footer
 st.markdown("---")
@@ -4,11 +4,22 @@ that doesn't rely on browser automation.
 """
 
 from langchain_openai import ChatOpenAI
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
+import streamlit as st
+from pydantic import BaseModel, Field, ValidationError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 from dotenv import load_dotenv
-from typing import Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+import argparse
+import asyncio
+import httpx
 import json
+import openai
 import re
 import os
+import tiktoken
+import weakref
 
 # Ensure environment variables are loaded
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,19 +34,135 @@ if not OPENROUTER_API_KEY:
         "For Streamlit Cloud deployment, add it to your secrets."
     )
 
-try:
-    llm = ChatOpenAI(
-        model="anthropic/claude-3-sonnet",
-        temperature=0,
-        openai_api_key=OPENROUTER_API_KEY,
-        openai_api_base="https://openrouter.ai/api/v1",
-    )
-except Exception as e:
-    raise ConnectionError(
-        f"Error initializing LLM with OpenRouter: {str(e)}. "
-        "Please check your API key and internet connection."
-    ) from e
+LLM_MODEL = "anthropic/claude-3-sonnet"
+
+# Persist every completion on disk so repeat prompts survive restarts and
+# are shared between processes; st.cache_data below only lives in memory.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(script_dir, ".llm_cache.db"))
+set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+@st.cache_resource
+def get_llm() -> ChatOpenAI:
+    """Return the OpenRouter chat client shared by all sessions and reruns."""
+    try:
+        return ChatOpenAI(
+            model=LLM_MODEL,
+            temperature=0,
+            openai_api_key=OPENROUTER_API_KEY,
+            openai_api_base="https://openrouter.ai/api/v1",
+            # Retries are left to tenacity in _ainvoke_llm; client-side retries on
+            # top would multiply them into up to nine 60s attempts
+            max_retries=0,
+            timeout=60,
+            # Let OpenRouter pick the highest-throughput provider, skipping slow ones
+            extra_body={"provider": {"sort": "throughput", "allow_fallbacks": True}},
+            # HTTP/2 multiplexes the concurrent tender calls over one connection
+            http_client=httpx.Client(http2=True, limits=httpx.Limits(max_connections=32)),
+        )
+    except Exception as e:
+        raise ConnectionError(
+            f"Error initializing LLM with OpenRouter: {str(e)}. "
+            "Please check your API key and internet connection."
+        ) from e
+
+# Upper bound on concurrent OpenRouter requests, to stay within rate limits
+MAX_CONCURRENT_LLM_CALLS = 10
+
+# asyncio.Semaphore binds to the loop it is first contended on, and every
+# asyncio.run() (one per Streamlit rerun) starts a fresh loop, so keep one per loop.
+_llm_semaphores = weakref.WeakKeyDictionary()
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    """Return the LLM concurrency limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+    return semaphore
+
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def cached_llm(prompt: Union[str, List[Dict]], model: str, json_mode: bool = False) -> str:
+    """Invoke the LLM, memoized on (prompt, model) across Streamlit reruns."""
+    kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+    response = get_llm().invoke(prompt, **kwargs)
+    return response.content if hasattr(response, 'content') else str(response)
+
+# Failures worth retrying: dropped connections, timeouts, 429s and 5xx.
+# Auth and bad-request errors are not transient and surface immediately.
+_TRANSIENT_LLM_ERRORS = (
+    httpx.HTTPError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+# One retry policy for every OpenRouter call, streamed or not
+_llm_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(min=1, max=8),
+    retry=retry_if_exception_type(_TRANSIENT_LLM_ERRORS),
+    reraise=True,
+)
+
+@_llm_retry
+async def _ainvoke_llm(prompt: Union[str, List[Dict]], json_mode: bool = False) -> str:
+    """Invoke the LLM asynchronously, bounded by the concurrency limiter."""
+    # st.cache_data only wraps sync functions, so run the cached call in a worker thread
+    async with _get_llm_semaphore():
+        return await asyncio.to_thread(cached_llm, prompt, LLM_MODEL, json_mode)
+
+class EligibilityResult(BaseModel):
+    eligible: bool = True
+    match_score: int = 0
+    reasons: List[str] = Field(default_factory=list)
+    missing_requirements: List[str] = Field(default_factory=list)
+
+class TenderAnalysis(BaseModel):
+    parsed: Dict[str, Any]
+    eligibility: EligibilityResult
+    application_summary: str = ""
+
+class TenderBatchAnalysis(BaseModel):
+    analyses: List[TenderAnalysis]
 
+# Profile extraction patterns, compiled once at import rather than on every call
+_COMPANY_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"company[:\s]+([^\n,]+)",
+    r"startup[:\s]+([^\n,]+)",
+    r"organization[:\s]+([^\n,]+)",
+    r"firm[:\s]+([^\n,]+)",
+))
+
+_INDUSTRY_KEYWORDS = (
+    "tech", "healthcare", "fintech", "agriculture", "manufacturing",
+    "education", "retail", "logistics", "renewable energy", "ai", "blockchain",
+)
+
+# All industry keywords in one alternation, so the input is scanned once
+_INDUSTRY_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, _INDUSTRY_KEYWORDS)) + r")\b",
+    re.IGNORECASE,
+)
+
+_LOCATION_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"location[:\s]+([^\n,]+)",
+    r"based in[:\s]+([^\n,]+)",
+    r"from[:\s]+([^\n,]+)",
+    r"city[:\s]+([^\n,]+)",
+))
+
+_BUDGET_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"budget[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
+    r"funding[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
+    r"investment[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
+))
+
+_ADDL_KW_RE = re.compile(
+    r"\b(?:innovation|research|development|prototype|pilot|scale|growth)\b",
+    re.IGNORECASE,
+)
+
+@st.cache_data(show_spinner=False)
 def parse_user_profile(user_input: str) -> Dict:
     """Extracts company profile information from user input."""
     profile_data = {
@@ -49,119 +176,83 @@ def parse_user_profile(user_input: str) -> Dict:
     }
     
     # Extract company name
-    company_patterns = [
-        r"company[:\s]+([^\n,]+)",
-        r"startup[:\s]+([^\n,]+)",
-        r"organization[:\s]+([^\n,]+)",
-        r"firm[:\s]+([^\n,]+)",
-    ]
-    
-    for pattern in company_patterns:
-        match = re.search(pattern, user_input, re.IGNORECASE)
+    for rx in _COMPANY_RES:
+        match = rx.search(user_input)
         if match:
             profile_data["company_name"] = match.group(1).strip()
             break
     
     # Identify industry
-    industry_keywords = [
-        "tech", "healthcare", "fintech", "agriculture", "manufacturing",
-        "education", "retail", "logistics", "renewable energy", "ai", "blockchain",
-    ]
-    
-    found_industries = []
-    for keyword in industry_keywords:
-        if keyword.lower() in user_input.lower():
-            found_industries.append(keyword)
+    found_industries = list(dict.fromkeys(
+        m.group(1).lower() for m in _INDUSTRY_RE.finditer(user_input)
+    ))
     
     if found_industries:
         profile_data["industry"] = found_industries[0]
         profile_data["keywords"].extend(found_industries)
     
     # Extract location
-    location_patterns = [
-        r"location[:\s]+([^\n,]+)",
-        r"based in[:\s]+([^\n,]+)",
-        r"from[:\s]+([^\n,]+)",
-        r"city[:\s]+([^\n,]+)",
-    ]
-    
-    for pattern in location_patterns:
-        match = re.search(pattern, user_input, re.IGNORECASE)
+    for rx in _LOCATION_RES:
+        match = rx.search(user_input)
         if match:
             profile_data["location"] = match.group(1).strip()
             break
     
     # Extract budget
-    budget_patterns = [
-        r"budget[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
-        r"funding[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
-        r"investment[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
-    ]
-    
-    for pattern in budget_patterns:
-        match = re.search(pattern, user_input, re.IGNORECASE)
+    for rx in _BUDGET_RES:
+        match = rx.search(user_input)
         if match:
             profile_data["budget_range"] = match.group(1).strip()
             break
     
     # Add additional keywords
-    additional_keywords = re.findall(
-        r"\b(?:innovation|research|development|prototype|pilot|scale|growth)\b",
-        user_input,
-        re.IGNORECASE,
-    )
-    profile_data["keywords"].extend([kw.lower() for kw in additional_keywords])
-    profile_data["keywords"] = list(set(profile_data["keywords"]))
+    additional_keywords = _ADDL_KW_RE.findall(user_input)
+    profile_data["keywords"].extend(kw.lower() for kw in additional_keywords)
+    # Deduplicate in first-seen order so keywords[:2] (and the prompts built
+    # from it) are stable across runs, unlike iteration order of a set
+    profile_data["keywords"] = list(dict.fromkeys(profile_data["keywords"]))
     
     return profile_data
 
+@st.cache_data(show_spinner=False)
 def get_sample_tenders(keywords: str, location: str = None) -> List[Dict]:
     """Returns sample tenders based on keywords - for use in cloud environments."""
-    portals = [
-        "https://gem.gov.in",
-        "https://eprocure.gov.in",
-        "https://www.startupindia.gov.in",
-    ]
+    title = keywords.title()
     
-    tender_data = []
-    
-    # Generate sample data based on keywords
-    keywords_list = keywords.split()
-    
-    # Government e-Marketplace tenders
-    tender_data.append({
-        "title": f"{keywords.title()} Solutions for Government Sector",
-        "deadline": "Check Portal for Details",
-        "link": "https://gem.gov.in",
-        "source": "GeM",
-        "keywords_matched": keywords,
-        "description": f"A tender for {keywords} solutions across government departments."
-    })
-    
-    # eProcure tenders
-    tender_data.append({
-        "title": f"Request for Proposals: {keywords.title()} Implementation",
-        "deadline": "Check Portal for Details",
-        "link": "https://eprocure.gov.in",
-        "source": "eProcure",
-        "keywords_matched": keywords,
-        "description": f"Government initiative seeking {keywords} solutions for enhancing public services."
-    })
-    
-    # Startup India tender
-    tender_data.append({
-        "title": f"Innovation Grant for {keywords.title()} Startups",
-        "deadline": "Check Portal for Details",
-        "link": "https://www.startupindia.gov.in",
-        "source": "Startup India",
-        "keywords_matched": keywords,
-        "description": f"Funding opportunity for startups working in {keywords} sector."
-    })
+    tender_data = [
+        # Government e-Marketplace tenders
+        {
+            "title": f"{title} Solutions for Government Sector",
+            "deadline": "Check Portal for Details",
+            "link": "https://gem.gov.in",
+            "source": "GeM",
+            "keywords_matched": keywords,
+            "description": f"A tender for {keywords} solutions across government departments."
+        },
+        # eProcure tenders
+        {
+            "title": f"Request for Proposals: {title} Implementation",
+            "deadline": "Check Portal for Details",
+            "link": "https://eprocure.gov.in",
+            "source": "eProcure",
+            "keywords_matched": keywords,
+            "description": f"Government initiative seeking {keywords} solutions for enhancing public services."
+        },
+        # Startup India tender
+        {
+            "title": f"Innovation Grant for {title} Startups",
+            "deadline": "Check Portal for Details",
+            "link": "https://www.startupindia.gov.in",
+            "source": "Startup India",
+            "keywords_matched": keywords,
+            "description": f"Funding opportunity for startups working in {keywords} sector."
+        },
+    ]
     
     # Add location-specific tender if location is provided
     if location:
         tender_data.append({
-            "title": f"Local {keywords.title()} Initiative in {location}",
+            "title": f"Local {title} Initiative in {location}",
             "deadline": "Check Portal for Details",
             "link": "https://gem.gov.in",
             "source": "GeM",
@@ -171,129 +262,272 @@ def get_sample_tenders(keywords: str, location: str = None) -> List[Dict]:
     
     return tender_data
 
-def parse_tender_document(tender_content: str) -> Dict:
-    """Extract key information from tender document using LLM."""
-    prompt = f"""
-    Extract key information from this tender document and return as JSON:
+# Token budget for the tender text embedded in each analysis prompt
+MAX_TENDER_TOKENS = 1500
+
+# Analyze all tenders of a query in one request instead of one request each.
+# The shared profile and instructions dominate the prompt and the per-tender
+# output is short, so one round-trip beats several concurrent ones; the
+# per-tender path remains as the fallback when the batched reply is unusable.
+BATCH_TENDER_ANALYSIS = True
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens tokens, ending on a token boundary."""
+    # cl100k_base only approximates Claude's tokenizer, which is close enough for a budget
+    encoding = tiktoken.get_encoding("cl100k_base")
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+def _profile_block(profile: dict) -> str:
+    """Format the company profile section shared by the LLM prompts."""
+    return f"""COMPANY PROFILE:
+    - Name: {profile.get('company_name', 'N/A')}
+    - Industry: {profile.get('industry', 'N/A')}
+    - Location: {profile.get('location', 'N/A')}
+    - Budget: {profile.get('budget_range', 'N/A')}
+    - Keywords: {profile.get('keywords', [])}"""
+
+def _with_cached_profile(profile: dict, request: str) -> List[Dict]:
+    """Build chat messages with the company profile as a prompt-cached prefix.
     
-    {tender_content[:2000]}
+    The profile is identical across every call made for one query, so it goes
+    first, in a system message carrying an Anthropic cache_control breakpoint;
+    only the tender-specific request after it changes between calls.
+    """
+    return [
+        {
+            "role": "system",
+            "content": [{
+                "type": "text",
+                "text": f"You help the company below find and apply for government tenders.\n    \n    {_profile_block(profile)}",
+                "cache_control": {"type": "ephemeral"},
+            }],
+        },
+        {"role": "user", "content": request},
+    ]
+
+def _analysis_fields(include_summary: bool) -> str:
+    """Describe the fields of one tender analysis in the requested JSON."""
+    summary_field = """
+    - application_summary: a 200-word professional application summary
+      highlighting company strengths relevant to this tender""" if include_summary else ""
+    
+    return f"""- parsed: object with title, description, deadline, budget_range,
+      eligibility_criteria, application_requirements, contact_details, tender_id
+    - eligibility: object with eligible (true/false), match_score (0-100),
+      reasons (list of reasons), missing_requirements (list){summary_field}"""
+
+async def analyze_tender(tender: dict, profile: dict, include_summary: bool = True) -> Dict:
+    """Parse a tender, check eligibility and draft a summary in a single LLM call.
     
-    Extract:
-    - title
-    - description  
-    - deadline
-    - budget_range
-    - eligibility_criteria
-    - application_requirements
-    - contact_details
-    - tender_id
+    With include_summary=False the summary is left out of the request, for
+    callers that stream it separately via generate_application_summary_stream.
+    """
+    request = f"""
+    Analyze this tender for the company and return a single JSON object.
+    
+    TENDER DOCUMENT:
+    {_truncate_tokens(str(tender), MAX_TENDER_TOKENS)}
+    
+    Return JSON with:
+    {_analysis_fields(include_summary)}
     
     Return only valid JSON format.
     """
     
-    try:
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        parsed_data = json.loads(content)
-        return parsed_data
-    except:
-        return {
+    # Re-prompt once on malformed output before falling back to the stub
+    for attempt in (request, request + "\n    Return ONLY valid JSON, no prose.\n"):
+        content = await _ainvoke_llm(_with_cached_profile(profile, attempt), json_mode=True)
+        try:
+            return TenderAnalysis.model_validate_json(content).model_dump()
+        except ValidationError:
+            continue
+    
+    return {
+        "parsed": {
             "title": "Document Parse Error",
-            "description": tender_content[:200] + "...",
+            "description": str(tender)[:200] + "...",
             "deadline": None,
             "budget_range": None,
             "eligibility_criteria": "Review document manually",
             "application_requirements": "Review document manually",
             "contact_details": None,
             "tender_id": None
-        }
-
-def check_eligibility(tender_data: dict, user_profile: dict) -> Dict:
-    """Check if company is eligible for tender using LLM."""
-    prompt = f"""
-    Analyze if this company profile matches the tender requirements:
-    
-    COMPANY PROFILE:
-    - Name: {user_profile.get('company_name', 'N/A')}
-    - Industry: {user_profile.get('industry', 'N/A')}
-    - Location: {user_profile.get('location', 'N/A')}
-    - Budget: {user_profile.get('budget_range', 'N/A')}
-    - Keywords: {user_profile.get('keywords', [])}
-    
-    TENDER DETAILS:
-    - Title: {tender_data.get('title', 'N/A')}
-    - Eligibility: {tender_data.get('eligibility_criteria', 'N/A')}
-    - Budget: {tender_data.get('budget_range', 'N/A')}
-    - Requirements: {tender_data.get('application_requirements', 'N/A')}
-    
-    Return JSON with:
-    - eligible: true/false
-    - match_score: 0-100
-    - reasons: list of reasons
-    - missing_requirements: list
-    """
-    
-    try:
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        result = json.loads(content)
-        return result
-    except:
-        return {
+        },
+        "eligibility": {
             "eligible": True,
             "match_score": 75,
             "reasons": ["General eligibility assumed"],
             "missing_requirements": ["Manual review required"],
-        }
+        },
+        "application_summary": _fallback_summary(tender, profile) if include_summary else "",
+    }
 
-def generate_application_summary(tender_details: dict, company_profile: dict) -> str:
-    """Generate application summary using LLM."""
-    prompt = f"""
+def _fallback_summary(tender: dict, profile: dict) -> str:
+    """Placeholder summary used when the LLM call fails."""
+    return f"Application summary for {profile.get('company_name', 'Company')} applying to {tender.get('title', 'tender')}. Manual completion required."
+
+@_llm_retry
+async def _open_summary_stream(prompt: List[Dict]):
+    """Take an LLM slot, start a summary stream and wait for its first chunk, so failures before any output are retried.
+    
+    On success the slot stays held and the caller releases it once the stream
+    is drained; on failure the stream is closed and the slot released before
+    tenacity backs off, like _ainvoke_llm.
+    """
+    semaphore = _get_llm_semaphore()
+    await semaphore.acquire()
+    stream = get_llm().astream(prompt)
+    try:
+        first = await stream.__anext__()
+    except BaseException:
+        await stream.aclose()
+        semaphore.release()
+        raise
+    return stream, first
+
+async def generate_application_summary_stream(tender_details: dict, company_profile: dict) -> AsyncIterator[str]:
+    """Stream an application summary token by token, falling back to a placeholder on failure."""
+    request = f"""
     Generate a professional application summary for this tender:
     
     TENDER: {tender_details.get('title', 'N/A')}
     REQUIREMENTS: {tender_details.get('application_requirements', 'N/A')}
     
-    COMPANY: {company_profile.get('company_name', 'N/A')}
-    INDUSTRY: {company_profile.get('industry', 'N/A')}
-    CAPABILITIES: {', '.join(company_profile.get('keywords', []))}
-    
     Write a 200-word application summary highlighting company strengths relevant to this tender.
     """
     
     try:
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        return content.strip()
-    except:
-        return f"Application summary for {company_profile.get('company_name', 'Company')} applying to {tender_details.get('title', 'tender')}. Manual completion required."
-
-def main_tender_agent(query: str) -> str:
-    """Main function to process user input and generate tender recommendations."""
-    user_profile = parse_user_profile(query)
-    
-    if not user_profile.get("keywords"):
-        return "Please provide more details about your company, industry, and location to find relevant tenders."
+        stream, first = await _open_summary_stream(_with_cached_profile(company_profile, request))
+    except Exception:
+        yield _fallback_summary(tender_details, company_profile)
+        return
     
+    try:
+        yield first.content
+        # Text already shown can't be taken back, so a mid-stream failure is
+        # not retried; the placeholder is appended instead
+        try:
+            async for chunk in stream:
+                yield chunk.content
+        except Exception:
+            yield "\n\n" + _fallback_summary(tender_details, company_profile)
+    finally:
+        await stream.aclose()
+        _get_llm_semaphore().release()
+
+def search_tenders(user_profile: Dict) -> List[Dict]:
+    """Find candidate tenders for a parsed company profile."""
     keywords = " ".join(user_profile["keywords"][:2])
     location = user_profile.get("location", "")
     
     # Use the cloud-friendly get_sample_tenders instead of web scraping
-    tenders = get_sample_tenders(keywords, location)
+    return get_sample_tenders(keywords, location)
+
+async def analyze_tenders_batch(tenders: List[Dict], profile: dict, include_summary: bool = True) -> Optional[List[Dict]]:
+    """Analyze several tenders in one LLM call, sharing the company profile.
+    
+    Returns one analysis per tender, in order, or None when the reply cannot
+    be matched up with the tenders so the caller can fall back to per-tender calls.
+    """
+    tender_blocks = "\n    \n    ".join(
+        f"TENDER {i}:\n    {_truncate_tokens(str(tender), MAX_TENDER_TOKENS)}"
+        for i, tender in enumerate(tenders, 1)
+    )
+    
+    request = f"""
+    Analyze each of the {len(tenders)} tenders below for the company and return a single
+    JSON object with an "analyses" array, where element i describes TENDER i.
+    
+    {tender_blocks}
+    
+    Each element of "analyses" has:
+    {_analysis_fields(include_summary)}
+    
+    Return only valid JSON format.
+    """
+    
+    content = await _ainvoke_llm(_with_cached_profile(profile, request), json_mode=True)
+    try:
+        analyses = TenderBatchAnalysis.model_validate_json(content).analyses
+    except ValidationError:
+        return None
+    
+    if len(analyses) != len(tenders):
+        return None
+    return [analysis.model_dump() for analysis in analyses]
+
+async def analyze_tenders(tenders: List[Dict], user_profile: Dict, include_summary: bool = True) -> AsyncIterator[Dict]:
+    """Analyze the top tenders, yielding eligible ones as they finish."""
+    top_tenders = tenders[:3]
+    
+    if BATCH_TENDER_ANALYSIS:
+        analyses = await analyze_tenders_batch(top_tenders, user_profile, include_summary)
+        if analyses is not None:
+            for number, (tender, analysis) in enumerate(zip(top_tenders, analyses), 1):
+                if analysis["eligibility"].get("eligible", True):
+                    yield {"number": number, "tender": tender, **analysis}
+            return
+    
+    async def analyze_numbered(number: int, tender: Dict):
+        return number, tender, await analyze_tender(tender, user_profile, include_summary)
+    
+    # One LLM call per tender, with the calls for all tenders in flight at once
+    pending = [analyze_numbered(i + 1, t) for i, t in enumerate(top_tenders)]
+    for done in asyncio.as_completed(pending):
+        number, tender, analysis = await done
+        if analysis["eligibility"].get("eligible", True):
+            yield {"number": number, "tender": tender, **analysis}
+
+NEXT_STEPS = [
+    "Visit the portal links to get complete tender documents",
+    "Review eligibility criteria carefully",
+    "Prepare required documents",
+    "Submit before deadline",
+]
+
+class TenderSearchError(Exception):
+    """Raised with a user-facing message when a query cannot produce a tender search."""
+
+async def main_tender_agent(query: str, include_summary: bool = True) -> AsyncIterator[Dict]:
+    """Main function to process user input and generate tender recommendations.
+    
+    Yields eligible tender analyses in completion order, so callers can render
+    each one as soon as it is ready; the company profile comes from
+    parse_user_profile(query).
+    """
+    user_profile = parse_user_profile(query)
+    
+    if not user_profile.get("keywords"):
+        raise TenderSearchError("Please provide more details about your company, industry, and location to find relevant tenders.")
+    
+    tenders = search_tenders(user_profile)
     
     if not tenders:
-        return f"No tenders found for keywords: {keywords}. Try different search terms."
+        raise TenderSearchError(f"No tenders found for keywords: {' '.join(user_profile['keywords'][:2])}. Try different search terms.")
     
-    results = []
-    for i, tender in enumerate(tenders[:3]):
-        parsed_tender = parse_tender_document(str(tender))
-        eligibility = check_eligibility(parsed_tender, user_profile)
+    async for result in analyze_tenders(tenders, user_profile, include_summary):
+        yield result
+
+async def collect_tender_results(query: str, include_summary: bool = True) -> List[Dict]:
+    """Run main_tender_agent to completion and return its results in tender order."""
+    results = [result async for result in main_tender_agent(query, include_summary)]
+    return sorted(results, key=lambda result: result["number"])
+
+def format_tender_results(user_profile: Dict, results: List[Dict]) -> str:
+    """Render tender analyses as plain text for the command-line interface."""
+    if not results:
+        return "No eligible tenders found matching your profile."
+    
+    sections = []
+    for analysis in results:
+        tender = analysis["tender"]
+        eligibility = analysis["eligibility"]
         
-        if eligibility.get("eligible", True):
-            app_summary = generate_application_summary(parsed_tender, user_profile)
-            
-            result = f"""
-TENDER {i+1}: {tender['title']}
+        sections.append(f"""
+TENDER {analysis['number']}: {tender['title']}
 SOURCE: {tender['source']}
 LINK: {tender['link']}
 MATCH SCORE: {eligibility.get('match_score', 'N/A')}%
@@ -303,43 +537,86 @@ ELIGIBILITY: {'✅ Eligible' if eligibility.get('eligible') else '❌ Not Eligib
 REASONS: {', '.join(eligibility.get('reasons', ['Review required']))}
 
 APPLICATION SUMMARY:
-{app_summary[:300]}...
+{analysis['application_summary'][:300]}...
 
 ---
-"""
-            results.append(result)
+""")
     
-    if not results:
-        return "No eligible tenders found matching your profile."
+    next_steps = "\n".join(f"{i}. {step}" for i, step in enumerate(NEXT_STEPS, 1))
     
     return f"""
 TENDER SEARCH RESULTS FOR: {user_profile.get('company_name', 'Your Company')}
 INDUSTRY: {user_profile.get('industry', 'N/A')}
 LOCATION: {user_profile.get('location', 'N/A')}
 
-{''.join(results)}
+{''.join(sections)}
 
 📋 NEXT STEPS:
-1. Visit the portal links to get complete tender documents
-2. Review eligibility criteria carefully
-3. Prepare required documents
-4. Submit before deadline
+{next_steps}
 """
 
+async def run_batch(input_path: str, output_path: str, concurrency: int = 16) -> None:
+    """Process a JSONL file of {"query": ...} lines, writing one result line per query."""
+    # A malformed line gets an error record instead of aborting the whole batch
+    inputs = []
+    with open(input_path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                query = json.loads(line)["query"]
+                if not isinstance(query, str):
+                    raise TypeError(f"query must be a string, got {type(query).__name__}")
+                inputs.append(query)
+            except (ValueError, TypeError, KeyError) as e:
+                inputs.append({"line": n, "error": f"invalid input line: {e!r}"})
+    
+    # Bounds whole queries in flight; MAX_CONCURRENT_LLM_CALLS still caps LLM requests
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one(query: Union[str, Dict]) -> Dict:
+        if not isinstance(query, str):
+            return query
+        async with semaphore:
+            try:
+                results = await collect_tender_results(query)
+                return {"query": query, "profile": parse_user_profile(query), "results": results}
+            except Exception as e:
+                return {"query": query, "error": str(e)}
+    
+    records = await asyncio.gather(*(one(q) for q in inputs))
+    
+    with open(output_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
 if __name__ == "__main__":
-    print("🤖 Government Tender AI Agent Started!")
-    print("Enter your company details to find relevant tenders...")
-    
-    while True:
-        user_input = input("\n💬 You: ")
+    parser = argparse.ArgumentParser(description="Government Tender AI Agent")
+    parser.add_argument("--batch", metavar="INPUT_JSONL", help="process queries from a JSONL file instead of the interactive prompt")
+    parser.add_argument("--out", default="results.jsonl", help="where --batch writes its results (default: results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=16, help="queries processed at once in --batch mode (default: 16)")
+    args = parser.parse_args()
+    
+    if args.batch:
+        asyncio.run(run_batch(args.batch, args.out, args.concurrency))
+        print(f"✅ Results written to {args.out}")
+    else:
+        print("🤖 Government Tender AI Agent Started!")
+        print("Enter your company details to find relevant tenders...")
         
-        if user_input.lower() in ["exit", "quit", "bye"]:
-            print("👋 Goodbye!")
-            break
+        while True:
+            user_input = input("\n💬 You: ")
             
-        try:
-            response = main_tender_agent(user_input)
-            print(f"\n🎯 Agent: {response}")
-        except Exception as e:
-            print(f"\n❌ Error: {e}")
-            print("Please try again with different input.")
+            if user_input.lower() in ["exit", "quit", "bye"]:
+                print("👋 Goodbye!")
+                break
+                
+            try:
+                results = asyncio.run(collect_tender_results(user_input))
+                response = format_tender_results(parse_user_profile(user_input), results)
+                print(f"\n🎯 Agent: {response}")
+            except TenderSearchError as e:
+                print(f"\n🎯 Agent: {e}")
+            except Exception as e:
+                print(f"\n❌ Error: {e}")
+                print("Please try again with different input.")
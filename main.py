@@ -1,20 +1,30 @@
 from langchain_openai import ChatOpenAI
-from langchain.agents import initialize_agent, AgentType
 from langchain.tools import StructuredTool
-from langchain_community.document_loaders import PyPDFLoader, WebBaseLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.memory import ConversationBufferMemory
+from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.chat_history import BaseChatMessageHistory
-from langchain.memory.chat_message_histories.in_memory import ChatMessageHistory
-from playwright.sync_api import sync_playwright
-from pydantic import BaseModel
+from langchain_core.exceptions import OutputParserException
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+from playwright.async_api import async_playwright
+from pydantic import BaseModel, Field, ValidationError
+from selectolax.parser import HTMLParser
 from dotenv import load_dotenv
-import requests
-import json
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+import asyncio
+import atexit
+import fitz
+import hashlib
+import httpx
+import openai
+import orjson
 import re
 import os
-import time
+import threading
+import tiktoken
+from collections import OrderedDict
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
@@ -32,12 +42,60 @@ if not OPENROUTER_API_KEY:
         "For Streamlit Cloud deployment, add it to your secrets."
     )
     
+# Every coroutine that touches a pooled connection or the browser runs on this
+# one long-lived loop, because pooled async connections and Playwright objects
+# are bound to the loop that created them and asyncio.run() would start a new
+# one per query
+_IO_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_IO_LOOP.run_forever, name="tender-io", daemon=True).start()
+
+
+def _run_on_io_loop(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _IO_LOOP).result()
+
+
+# Shared keep-alive pools for OpenRouter and PDF downloads, so TLS setup is
+# paid once per host rather than per call and HTTP/2 multiplexes concurrent
+# LLM requests over one connection
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+_CLIENT = httpx.Client(http2=True, timeout=60, limits=_HTTP_LIMITS)
+_ASYNC_CLIENT = httpx.AsyncClient(http2=True, timeout=60, limits=_HTTP_LIMITS)
+
+LLM_MODEL = "anthropic/claude-3-sonnet"
+
+# Retries are left to tenacity (_llm_retry below), as in cloud_main; client-side
+# retries on top would multiply them
 try:
     llm = ChatOpenAI(
-        model="anthropic/claude-3-sonnet",
+        model=LLM_MODEL,
         temperature=0,
         openai_api_key=OPENROUTER_API_KEY,
         openai_api_base="https://openrouter.ai/api/v1",
+        max_retries=0,
+        http_client=_CLIENT,
+        http_async_client=_ASYNC_CLIENT,
+    )
+    # Field extraction and eligibility checks are structured tasks that a
+    # smaller model handles at a fraction of the latency and cost
+    llm_fast = ChatOpenAI(
+        model=os.getenv("FAST_LLM_MODEL", "anthropic/claude-3-haiku"),
+        temperature=0,
+        openai_api_key=OPENROUTER_API_KEY,
+        openai_api_base="https://openrouter.ai/api/v1",
+        max_retries=0,
+        http_client=_CLIENT,
+        http_async_client=_ASYNC_CLIENT,
+    )
+    # langgraph makes the agent's model calls, outside _llm_retry, so this
+    # client keeps its own retries
+    agent_llm = ChatOpenAI(
+        model=LLM_MODEL,
+        temperature=0,
+        openai_api_key=OPENROUTER_API_KEY,
+        openai_api_base="https://openrouter.ai/api/v1",
+        max_retries=2,
+        http_client=_CLIENT,
+        http_async_client=_ASYNC_CLIENT,
     )
 except Exception as e:
     raise ConnectionError(
@@ -45,6 +103,11 @@ except Exception as e:
         "Please check your API key and internet connection."
     ) from e
 
+# Persist every completion on disk so identical prompts are never re-sent,
+# across sessions and restarts
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(script_dir, ".llm_cache.db"))
+set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
 
 class UserProfileInput(BaseModel):
     user_input: str
@@ -69,6 +132,59 @@ class ApplicationInput(BaseModel):
     company_profile: dict
 
 
+class EligibilityResult(BaseModel):
+    eligible: bool
+    match_score: int = Field(description="0-100")
+    reasons: List[str]
+    missing_requirements: List[str]
+
+
+class TenderAssessment(BaseModel):
+    eligibility: EligibilityResult
+    application_summary: str = Field(
+        description="200-word application summary highlighting company strengths relevant to this tender"
+    )
+
+
+# Profile extraction patterns, compiled once at import rather than on every call.
+# Company, location and budget share one alternation with a named group per
+# field, so a single pass over the input fills all three. It sits in a
+# lookahead so a match doesn't consume text: in "company: Acme from Delhi" the
+# company value still contains the location cue
+_PROFILE_RE = re.compile(
+    r"(?=(?:company|startup|organization|firm)[:\s]+(?P<company_name>[^\n,]+)"
+    r"|(?:location|based in|from|city)[:\s]+(?P<location>[^\n,]+)"
+    r"|(?:budget|funding|investment)[:\s]+(?P<budget_range>[0-9,]+(?:\s*(?:lakh|crore|million|k))?))",
+    re.IGNORECASE,
+)
+_PROFILE_FIELDS = ("company_name", "location", "budget_range")
+
+_INDUSTRY_KEYWORDS = (
+    "tech",
+    "healthcare",
+    "fintech",
+    "agriculture",
+    "manufacturing",
+    "education",
+    "retail",
+    "logistics",
+    "renewable energy",
+    "ai",
+    "blockchain",
+)
+
+# All industry keywords in one alternation, so the input is scanned once
+_INDUSTRY_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, _INDUSTRY_KEYWORDS)) + r")\b",
+    re.IGNORECASE,
+)
+
+_EXTRA_KW_RE = re.compile(
+    r"\b(?:innovation|research|development|prototype|pilot|scale|growth)\b",
+    re.IGNORECASE,
+)
+
+
 def parse_user_profile(user_input: str) -> Dict:
     profile_data = {
         "company_name": None,
@@ -80,81 +196,357 @@ def parse_user_profile(user_input: str) -> Dict:
         "preferences": {},
     }
 
-    company_patterns = [
-        r"company[:\s]+([^\n,]+)",
-        r"startup[:\s]+([^\n,]+)",
-        r"organization[:\s]+([^\n,]+)",
-        r"firm[:\s]+([^\n,]+)",
-    ]
-
-    for pattern in company_patterns:
-        match = re.search(pattern, user_input, re.IGNORECASE)
-        if match:
-            profile_data["company_name"] = match.group(1).strip()
-            break
-
-    industry_keywords = [
-        "tech",
-        "healthcare",
-        "fintech",
-        "agriculture",
-        "manufacturing",
-        "education",
-        "retail",
-        "logistics",
-        "renewable energy",
-        "ai",
-        "blockchain",
-    ]
+    # Each field takes its first match in the text; stop once all are filled
+    for match in _PROFILE_RE.finditer(user_input):
+        field = match.lastgroup
+        if profile_data[field] is None:
+            profile_data[field] = match.group(field).strip()
+            if all(profile_data[f] is not None for f in _PROFILE_FIELDS):
+                break
 
-    found_industries = []
-    for keyword in industry_keywords:
-        if keyword.lower() in user_input.lower():
-            found_industries.append(keyword)
+    found_industries = list(
+        dict.fromkeys(m.group(1).lower() for m in _INDUSTRY_RE.finditer(user_input))
+    )
 
     if found_industries:
         profile_data["industry"] = found_industries[0]
         profile_data["keywords"].extend(found_industries)
 
-    location_patterns = [
-        r"location[:\s]+([^\n,]+)",
-        r"based in[:\s]+([^\n,]+)",
-        r"from[:\s]+([^\n,]+)",
-        r"city[:\s]+([^\n,]+)",
-    ]
+    profile_data["keywords"].extend(_EXTRA_KW_RE.findall(user_input))
+    # Lowercase and deduplicate in one pass, keeping first-seen order so the
+    # search terms built from keywords[:2] are stable between runs
+    profile_data["keywords"] = list(
+        dict.fromkeys(kw.lower() for kw in profile_data["keywords"])
+    )
 
-    for pattern in location_patterns:
-        match = re.search(pattern, user_input, re.IGNORECASE)
-        if match:
-            profile_data["location"] = match.group(1).strip()
-            break
+    return profile_data
+
+
+# One Chromium per process instead of one per query; each portal only opens a
+# fresh BrowserContext. Playwright objects are bound to the event loop that
+# created them, so the browser lives on _IO_LOOP like the async HTTP client
+_PW = None
+_BROWSER = None
+_BROWSER_LOCK = asyncio.Lock()
+
+
+async def _get_async_browser():
+    global _PW, _BROWSER
+    # Double-checked so warm-up and queries racing on first use launch only once
+    if _BROWSER is not None and _BROWSER.is_connected():
+        return _BROWSER
+    async with _BROWSER_LOCK:
+        if _BROWSER is None or not _BROWSER.is_connected():
+            if _PW is None:
+                _PW = await async_playwright().start()
+            _BROWSER = await _PW.chromium.launch(
+                headless=True, args=["--disable-dev-shm-usage", "--no-sandbox"]
+            )
+        return _BROWSER
+
+
+def warm_up_browser():
+    # Launch Chromium in the background so the first query doesn't pay for it;
+    # a failed launch is simply retried by the first scrape
+    return asyncio.run_coroutine_threadsafe(_get_async_browser(), _IO_LOOP)
+
+
+async def _shutdown_io():
+    global _PW, _BROWSER
+    await _SCRAPE_HTTP.aclose()
+    await _ASYNC_CLIENT.aclose()
+    _CLIENT.close()
+    async with _BROWSER_LOCK:
+        if _BROWSER is not None:
+            await _BROWSER.close()
+            _BROWSER = None
+        if _PW is not None:
+            await _PW.stop()
+            _PW = None
 
-    budget_patterns = [
-        r"budget[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
-        r"funding[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
-        r"investment[:\s]+([0-9,]+(?:\s*(?:lakh|crore|million|k))?)",
+
+def _close_io():
+    try:
+        _run_on_io_loop(_shutdown_io())
+    except Exception:
+        pass
+
+
+atexit.register(_close_io)
+
+
+# Portals whose search results are server-rendered are fetched over plain HTTP,
+# which takes ~100ms instead of the seconds a Chromium page load costs. The
+# client is only used from _IO_LOOP, so its connection pool stays warm
+_SCRAPE_HTTP = httpx.AsyncClient(
+    http2=True,
+    timeout=10,
+    follow_redirects=True,
+    headers={
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+        )
+    },
+)
+_GEM_SEARCH_URL = "https://bidplus.gem.gov.in/all-bids"
+
+
+class NeedsJS(Exception):
+    pass
+
+
+async def _fetch_html(url: str, params: Dict) -> HTMLParser:
+    try:
+        response = await _SCRAPE_HTTP.get(url, params=params)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        raise NeedsJS(str(e)) from e
+    return HTMLParser(response.text)
+
+
+async def _fetch_gem_http(portal: str, keywords: str) -> List[Dict]:
+    tree = await _fetch_html(_GEM_SEARCH_URL, {"searchBid": keywords})
+    # Nothing confirms that searchBid filters the listing, so only rows that
+    # actually mention a keyword count as matches; with none, the portal goes
+    # through Playwright instead
+    terms = [term.lower() for term in keywords.split()]
+    titles = [
+        text
+        for text in (node.text(strip=True) for node in tree.css(".bid_no_line"))
+        if any(term in text.lower() for term in terms)
+    ]
+    if not titles:
+        raise NeedsJS("No GeM rows matching the keywords in the static page")
+
+    return [
+        {
+            "title": title[:100],
+            "deadline": "Check Portal",
+            "link": portal,
+            "source": "GeM",
+            "keywords_matched": keywords,
+        }
+        for title in titles[:5]
     ]
 
-    for pattern in budget_patterns:
-        match = re.search(pattern, user_input, re.IGNORECASE)
-        if match:
-            profile_data["budget_range"] = match.group(1).strip()
-            break
 
-    additional_keywords = re.findall(
-        r"\b(?:innovation|research|development|prototype|pilot|scale|growth)\b",
-        user_input,
-        re.IGNORECASE,
-    )
-    profile_data["keywords"].extend([kw.lower() for kw in additional_keywords])
-    profile_data["keywords"] = list(set(profile_data["keywords"]))
+# eProcure has no handler: its public listings aren't a keyword search, so
+# unfiltered rows would pass as matches. It goes through Playwright instead
+_PORTAL_HANDLERS = {
+    "gem.gov.in": _fetch_gem_http,
+}
 
-    return profile_data
 
+async def _scrape_http(portal: str, keywords: str) -> List[Dict]:
+    for domain, handler in _PORTAL_HANDLERS.items():
+        if domain in portal:
+            return await handler(portal, keywords)
+    raise NeedsJS(portal)
 
-def scrape_tender_portals(keywords: str, location: str = None) -> List[Dict]:
+
+# Each selector list is one CSS union, so a missing alternative costs nothing
+# instead of Playwright's 30s auto-wait per miss
+_GEM_SEARCH_SELECTOR = 'input[placeholder*="search" i], input[name*="search" i], #searchBox'
+_GEM_RESULT_SELECTOR = '.tender-item, .result-item, .tender-card, tr[class*="row"]'
+SELECTOR_TIMEOUT_MS = 2000
+RESULTS_TIMEOUT_MS = 5000
+
+
+async def _search_box(page, selector: str):
+    # Only visible matches: the first match in document order may be a hidden
+    # input, which fill() would wait on for Playwright's default 30s
+    box = page.locator(selector).filter(visible=True).first
+    await box.wait_for(state="visible", timeout=SELECTOR_TIMEOUT_MS)
+    return box
+
+
+async def _scrape_gem(page, portal: str, keywords: str) -> List[Dict]:
+    tender_data = []
+
+    try:
+        box = await _search_box(page, _GEM_SEARCH_SELECTOR)
+        await box.fill(keywords, timeout=SELECTOR_TIMEOUT_MS)
+        await box.press("Enter", timeout=SELECTOR_TIMEOUT_MS)
+        await page.wait_for_selector(
+            _GEM_RESULT_SELECTOR, state="attached", timeout=RESULTS_TIMEOUT_MS
+        )
+    except:
+        return tender_data
+
+    results = await page.locator(_GEM_RESULT_SELECTOR).all()
+    for result in results[:5]:
+        title = result.locator("a, .title, .tender-title").first
+        if await title.count():
+            tender_data.append(
+                {
+                    "title": (await title.inner_text()).strip()[:100],
+                    "deadline": "Check Portal",
+                    "link": portal,
+                    "source": "GeM",
+                    "keywords_matched": keywords,
+                }
+            )
+
+    return tender_data
+
+
+async def _scrape_eprocure(page, portal: str, keywords: str) -> List[Dict]:
     tender_data = []
 
+    try:
+        box = await _search_box(page, 'input[type="text"]')
+        await box.fill(keywords, timeout=SELECTOR_TIMEOUT_MS)
+        await page.click(
+            'input[value*="Search" i], button[type="submit"]', timeout=SELECTOR_TIMEOUT_MS
+        )
+        await page.wait_for_load_state("networkidle")
+
+        rows = await page.query_selector_all("tr")
+        for row in rows[:3]:
+            cells = await row.query_selector_all("td")
+            if len(cells) >= 2:
+                tender_data.append(
+                    {
+                        "title": (await cells[0].inner_text()).strip()[:100],
+                        "deadline": "Check Portal",
+                        "link": portal,
+                        "source": "eProcure",
+                        "keywords_matched": keywords,
+                    }
+                )
+    except:
+        tender_data.append(
+            {
+                "title": f"Tenders available for {keywords}",
+                "deadline": "Check Portal",
+                "link": portal,
+                "source": "eProcure",
+                "keywords_matched": keywords,
+            }
+        )
+
+    return tender_data
+
+
+async def _scrape_startupindia(page, portal: str, keywords: str) -> List[Dict]:
+    tender_data = []
+
+    try:
+        box = await _search_box(page, 'input[placeholder*="Search" i]')
+        await box.fill(keywords, timeout=SELECTOR_TIMEOUT_MS)
+        await box.press("Enter", timeout=SELECTOR_TIMEOUT_MS)
+        await page.wait_for_load_state("networkidle")
+
+        results = await page.query_selector_all(".result, .grant, .scheme")
+        for result in results[:3]:
+            title_elem = await result.query_selector("h3, .title, a")
+            if title_elem:
+                tender_data.append(
+                    {
+                        "title": (await title_elem.inner_text()).strip()[:100],
+                        "deadline": "Check Portal",
+                        "link": portal,
+                        "source": "Startup India",
+                        "keywords_matched": keywords,
+                    }
+                )
+    except:
+        tender_data.append(
+            {
+                "title": f"Startup grants available for {keywords}",
+                "deadline": "Check Portal",
+                "link": portal,
+                "source": "Startup India",
+                "keywords_matched": keywords,
+            }
+        )
+
+    return tender_data
+
+
+_PORTAL_SCRAPERS = {
+    "gem.gov.in": _scrape_gem,
+    "eprocure.gov.in": _scrape_eprocure,
+    "startupindia.gov.in": _scrape_startupindia,
+}
+
+
+def _portal_error(portal: str, error: BaseException) -> Dict:
+    return {
+        "title": f'Error accessing {portal.split("//")[1]}',
+        "deadline": "N/A",
+        "link": portal,
+        "source": portal.split("//")[1],
+        "error": str(error),
+    }
+
+
+async def _scrape_one(browser, portal: str, keywords: str) -> List[Dict]:
+    ctx = await browser.new_context()
+    try:
+        page = await ctx.new_page()
+        await page.goto(portal, timeout=30000)
+        await page.wait_for_load_state("networkidle")
+
+        for domain, scraper in _PORTAL_SCRAPERS.items():
+            if domain in portal:
+                return await scraper(page, portal, keywords)
+        return []
+    except Exception as e:
+        return [_portal_error(portal, e)]
+    finally:
+        await ctx.close()
+
+
+async def _scrape_all(portals: List[str], keywords: str) -> List[Dict]:
+    # Try the HTTP handlers first; only portals that fail there need Chromium
+    results = dict(
+        zip(
+            portals,
+            await asyncio.gather(
+                *(_scrape_http(portal, keywords) for portal in portals),
+                return_exceptions=True,
+            ),
+        )
+    )
+    needs_browser = [p for p, r in results.items() if isinstance(r, BaseException)]
+
+    if needs_browser:
+        try:
+            browser = await _get_async_browser()
+        except Exception as browser_error:
+            # Handle browser initialization errors (common in cloud environments)
+            for portal in needs_browser:
+                results[portal] = [
+                    {
+                        "title": f"Sample tender for {keywords} on {portal.split('//')[1]}",
+                        "deadline": "Check Portal",
+                        "link": portal,
+                        "source": portal.split("//")[1],
+                        "keywords_matched": keywords,
+                        "note": "Using sample data (browser automation unavailable)"
+                    }
+                ]
+        else:
+            # Portals load in parallel, each in its own context
+            browser_results = await asyncio.gather(
+                *(_scrape_one(browser, portal, keywords) for portal in needs_browser),
+                return_exceptions=True,
+            )
+            for portal, result in zip(needs_browser, browser_results):
+                if isinstance(result, BaseException):
+                    result = [_portal_error(portal, result)]
+                results[portal] = result
+
+    tender_data = []
+    for portal in portals:
+        tender_data.extend(results[portal])
+
+    return tender_data
+
+
+def scrape_tender_portals(keywords: str, location: str = None) -> List[Dict]:
     portals = [
         "https://gem.gov.in",
         "https://eprocure.gov.in",
@@ -162,148 +554,9 @@ def scrape_tender_portals(keywords: str, location: str = None) -> List[Dict]:
     ]
 
     try:
-        with sync_playwright() as p:
-            try:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-
-                for portal in portals:
-                    try:
-                        page.goto(portal, timeout=30000)
-                        page.wait_for_load_state("networkidle")
-
-                        if "gem.gov.in" in portal:
-                            search_selectors = [
-                                'input[placeholder*="search" i]',
-                                'input[name*="search" i]',
-                                "#searchBox",
-                            ]
-
-                            for selector in search_selectors:
-                                try:
-                                    page.fill(selector, keywords)
-                                    page.press(selector, "Enter")
-                                    break
-                                except:
-                                    continue
-
-                            page.wait_for_load_state("networkidle")
-                            time.sleep(2)
-
-                            result_selectors = [
-                                ".tender-item",
-                                ".result-item",
-                                ".tender-card",
-                                'tr[class*="row"]',
-                            ]
-
-                            for selector in result_selectors:
-                                results = page.query_selector_all(selector)
-                                if results:
-                                    for result in results[:5]:
-                                        title = result.query_selector(
-                                            "a, .title, .tender-title"
-                                        )
-                                        if title:
-                                            tender_data.append(
-                                                {
-                                                    "title": title.inner_text().strip()[:100],
-                                                    "deadline": "Check Portal",
-                                                    "link": portal,
-                                                    "source": "GeM",
-                                                    "keywords_matched": keywords,
-                                                }
-                                            )
-                                    break
-
-                        elif "eprocure.gov.in" in portal:
-                            try:
-                                page.fill('input[type="text"]', keywords)
-                                page.click('input[value*="Search" i], button[type="submit"]')
-                                page.wait_for_load_state("networkidle")
-
-                                rows = page.query_selector_all("tr")
-                                for row in rows[:3]:
-                                    cells = row.query_selector_all("td")
-                                    if len(cells) >= 2:
-                                        tender_data.append(
-                                            {
-                                                "title": cells[0].inner_text().strip()[:100],
-                                                "deadline": "Check Portal",
-                                                "link": portal,
-                                                "source": "eProcure",
-                                                "keywords_matched": keywords,
-                                            }
-                                        )
-                            except:
-                                tender_data.append(
-                                    {
-                                        "title": f"Tenders available for {keywords}",
-                                        "deadline": "Check Portal",
-                                        "link": portal,
-                                        "source": "eProcure",
-                                        "keywords_matched": keywords,
-                                    }
-                                )
-
-                        elif "startupindia.gov.in" in portal:
-                            try:
-                                page.fill('input[placeholder*="Search" i]', keywords)
-                                page.press('input[placeholder*="Search" i]', "Enter")
-                                page.wait_for_load_state("networkidle")
-
-                                results = page.query_selector_all(".result, .grant, .scheme")
-                                for result in results[:3]:
-                                    title_elem = result.query_selector("h3, .title, a")
-                                    if title_elem:
-                                        tender_data.append(
-                                            {
-                                                "title": title_elem.inner_text().strip()[:100],
-                                                "deadline": "Check Portal",
-                                                "link": portal,
-                                                "source": "Startup India",
-                                                "keywords_matched": keywords,
-                                            }
-                                        )
-                            except:
-                                tender_data.append(
-                                    {
-                                        "title": f"Startup grants available for {keywords}",
-                                        "deadline": "Check Portal",
-                                        "link": portal,
-                                        "source": "Startup India",
-                                        "keywords_matched": keywords,
-                                    }
-                                )
-
-                        time.sleep(1)
-
-                    except Exception as e:
-                        tender_data.append(
-                            {
-                                "title": f'Error accessing {portal.split("//")[1]}',
-                                "deadline": "N/A",
-                                "link": portal,
-                                "source": portal.split("//")[1],
-                                "error": str(e),
-                            }
-                        )
-
-                browser.close()
-            except Exception as browser_error:
-                # Handle browser initialization errors (common in cloud environments)
-                for portal in portals:
-                    tender_data.append(
-                        {
-                            "title": f"Sample tender for {keywords} on {portal.split('//')[1]}",
-                            "deadline": "Check Portal",
-                            "link": portal,
-                            "source": portal.split("//")[1],
-                            "keywords_matched": keywords,
-                            "note": "Using sample data (browser automation unavailable)"
-                        }
-                    )
+        tender_data = _run_on_io_loop(_scrape_all(portals, keywords))
     except ImportError:
+        tender_data = []
         # In case Playwright is not available
         for portal in portals:
             tender_data.append(
@@ -333,11 +586,57 @@ def scrape_tender_portals(keywords: str, location: str = None) -> List[Dict]:
     return tender_data
 
 
-def parse_tender_document(tender_content: str) -> Dict:
-    prompt = f"""
+# Token budgets per prompt field, so long tender text can't balloon a request
+TITLE_TOKENS = 32
+CRITERIA_TOKENS = 400
+KEYWORDS_TOKENS = 50
+PROFILE_FIELD_TOKENS = 32
+# Roughly 5000 characters of tender text (~4 characters per token)
+DOCUMENT_TOKENS = 1250
+# Repeated lines at least this long are treated as page boilerplate by _fit
+MIN_BOILERPLATE_CHARS = 40
+# Anything still above this after fitting is a runaway prompt and is refused
+MAX_PROMPT_TOKENS = 60000
+
+
+class PromptTooLarge(ValueError):
+    pass
+
+
+def _fit(value, max_tokens: int) -> str:
+    text = value if isinstance(value, str) else str(value)
+    # cl100k_base only approximates Claude's tokenizer, which is close enough for a budget
+    encoding = tiktoken.get_encoding("cl100k_base")
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    # Over budget: drop repeated boilerplate lines (headers, footers, disclaimers)
+    # before cutting, but keep short lines like "Yes" or "N/A" that legitimately recur
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        key = line.strip()
+        if len(key) >= MIN_BOILERPLATE_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    tokens = encoding.encode("\n".join(lines))
+    return encoding.decode(tokens[:max_tokens])
+
+
+def _checked(prompt: str) -> str:
+    n_tokens = len(tiktoken.get_encoding("cl100k_base").encode(prompt))
+    if n_tokens > MAX_PROMPT_TOKENS:
+        raise PromptTooLarge(f"Prompt has {n_tokens} tokens (limit {MAX_PROMPT_TOKENS})")
+    return prompt
+
+
+def _parse_tender_prompt(tender_content: str, max_chars: Optional[int] = 2000) -> str:
+    return _checked(f"""
     Extract key information from this tender document and return as JSON:
     
-    {tender_content[:2000]}
+    {tender_content[:max_chars]}
     
     Extract:
     - title
@@ -350,103 +649,355 @@ def parse_tender_document(tender_content: str) -> Dict:
     - tender_id
     
     Return only valid JSON format.
-    """
+    """)
 
-    try:
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        parsed_data = json.loads(content)
-        return parsed_data
-    except:
-        return {
-            "title": "Document Parse Error",
-            "description": tender_content[:200] + "...",
-            "deadline": None,
-            "budget_range": None,
-            "eligibility_criteria": "Review document manually",
-            "application_requirements": "Review document manually",
-            "contact_details": None,
-            "tender_id": None,
-        }
+
+def _parse_tender_fallback(tender_content: str) -> Dict:
+    return {
+        "title": "Document Parse Error",
+        "description": tender_content[:200] + "...",
+        "deadline": None,
+        "budget_range": None,
+        "eligibility_criteria": "Review document manually",
+        "application_requirements": "Review document manually",
+        "contact_details": None,
+        "tender_id": None,
+    }
 
 
-def check_eligibility(tender_data: dict, user_profile: dict) -> Dict:
-    prompt = f"""
+def _eligibility_prompt(tender_data: dict, user_profile: dict) -> str:
+    return _checked(f"""
     Analyze if this company profile matches the tender requirements:
     
     COMPANY PROFILE:
-    - Name: {user_profile.get('company_name', 'N/A')}
-    - Industry: {user_profile.get('industry', 'N/A')}
-    - Location: {user_profile.get('location', 'N/A')}
-    - Budget: {user_profile.get('budget_range', 'N/A')}
-    - Keywords: {user_profile.get('keywords', [])}
+    - Name: {_fit(user_profile.get('company_name', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Industry: {_fit(user_profile.get('industry', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Location: {_fit(user_profile.get('location', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Budget: {_fit(user_profile.get('budget_range', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Keywords: {_fit(user_profile.get('keywords', []), KEYWORDS_TOKENS)}
     
     TENDER DETAILS:
-    - Title: {tender_data.get('title', 'N/A')}
-    - Eligibility: {tender_data.get('eligibility_criteria', 'N/A')}
-    - Budget: {tender_data.get('budget_range', 'N/A')}
-    - Requirements: {tender_data.get('application_requirements', 'N/A')}
+    - Title: {_fit(tender_data.get('title', 'N/A'), TITLE_TOKENS)}
+    - Eligibility: {_fit(tender_data.get('eligibility_criteria', 'N/A'), CRITERIA_TOKENS)}
+    - Budget: {_fit(tender_data.get('budget_range', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Requirements: {_fit(tender_data.get('application_requirements', 'N/A'), CRITERIA_TOKENS)}
     
     Return JSON with:
     - eligible: true/false
     - match_score: 0-100
     - reasons: list of reasons
     - missing_requirements: list
-    """
+    """)
 
-    try:
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
-        result = json.loads(content)
-        return result
-    except:
-        return {
-            "eligible": True,
-            "match_score": 75,
-            "reasons": ["General eligibility assumed"],
-            "missing_requirements": ["Manual review required"],
-        }
 
+def _eligibility_fallback() -> Dict:
+    return {
+        "eligible": True,
+        "match_score": 75,
+        "reasons": ["General eligibility assumed"],
+        "missing_requirements": ["Manual review required"],
+    }
 
-def generate_application_summary(tender_details: dict, company_profile: dict) -> str:
-    prompt = f"""
+
+def _summary_prompt(tender_details: dict, company_profile: dict) -> str:
+    return _checked(f"""
     Generate a professional application summary for this tender:
     
-    TENDER: {tender_details.get('title', 'N/A')}
-    REQUIREMENTS: {tender_details.get('application_requirements', 'N/A')}
+    TENDER: {_fit(tender_details.get('title', 'N/A'), TITLE_TOKENS)}
+    REQUIREMENTS: {_fit(tender_details.get('application_requirements', 'N/A'), CRITERIA_TOKENS)}
     
-    COMPANY: {company_profile.get('company_name', 'N/A')}
-    INDUSTRY: {company_profile.get('industry', 'N/A')}
-    CAPABILITIES: {', '.join(company_profile.get('keywords', []))}
+    COMPANY: {_fit(company_profile.get('company_name', 'N/A'), PROFILE_FIELD_TOKENS)}
+    INDUSTRY: {_fit(company_profile.get('industry', 'N/A'), PROFILE_FIELD_TOKENS)}
+    CAPABILITIES: {_fit(', '.join(company_profile.get('keywords', [])), KEYWORDS_TOKENS)}
     
     Write a 200-word application summary highlighting company strengths relevant to this tender.
-    """
+    """)
+
+
+def _summary_fallback(tender_details: dict, company_profile: dict) -> str:
+    return f"Application summary for {company_profile.get('company_name', 'Company')} applying to {tender_details.get('title', 'tender')}. Manual completion required."
+
+
+# Upper bound on concurrent OpenRouter requests, to stay within rate limits.
+# Both limits are process-wide, so concurrent sessions together stay under the
+# account's tier: _LLM_SLOTS for the sync tool functions, _ASYNC_LLM_SLOTS for
+# the async pipeline, which always runs on _IO_LOOP
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "10"))
+_LLM_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_LLM_CALLS)
+_ASYNC_LLM_SLOTS = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+# Failures worth retrying: dropped connections, timeouts, 429s and 5xx.
+# Auth and bad-request errors are not transient and surface immediately
+_TRANSIENT_LLM_ERRORS = (
+    httpx.HTTPError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+# One retry policy for every direct OpenRouter call, shared with cloud_main.
+# The slot is taken inside each attempt, so backoff doesn't hold one
+_llm_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(min=1, max=8),
+    retry=retry_if_exception_type(_TRANSIENT_LLM_ERRORS),
+    reraise=True,
+)
+
+
+@_llm_retry
+def _invoke_llm(model, prompt: str) -> str:
+    with _LLM_SLOTS:
+        response = model.invoke(prompt)
+    return response.content if hasattr(response, 'content') else str(response)
+
+
+@_llm_retry
+async def _ainvoke_llm(model, prompt: str):
+    async with _ASYNC_LLM_SLOTS:
+        return await model.ainvoke(prompt)
+
+
+# Parsed tenders keyed by the SHA-256 of the document, stored as JSON bytes so
+# every caller gets its own dict; the same tender is often scored for many profiles
+_PARSE_CACHE_MAXSIZE = 1024
+_parse_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+parse_cache_stats = {"hits": 0, "misses": 0}
+
+
+def parse_tender_document(tender_content: str) -> Dict:
+    digest = hashlib.sha256(tender_content.encode("utf-8")).hexdigest()
+
+    with _parse_cache_lock:
+        cached = _parse_cache.get(digest)
+        if cached is not None:
+            _parse_cache.move_to_end(digest)
+            parse_cache_stats["hits"] += 1
+            return orjson.loads(cached)
+        parse_cache_stats["misses"] += 1
 
     try:
-        response = llm.invoke(prompt)
-        content = response.content if hasattr(response, 'content') else str(response)
+        content = _invoke_llm(llm_fast, _parse_tender_prompt(tender_content))
+        parsed_data = orjson.loads(content)
+    except:
+        return _parse_tender_fallback(tender_content)
+
+    with _parse_cache_lock:
+        _parse_cache[digest] = orjson.dumps(parsed_data)
+        if len(_parse_cache) > _PARSE_CACHE_MAXSIZE:
+            _parse_cache.popitem(last=False)
+
+    return parsed_data
+
+
+def check_eligibility(tender_data: dict, user_profile: dict) -> Dict:
+    try:
+        content = _invoke_llm(llm_fast, _eligibility_prompt(tender_data, user_profile))
+        result = orjson.loads(content)
+        return result
+    except:
+        return _eligibility_fallback()
+
+
+def generate_application_summary(tender_details: dict, company_profile: dict) -> str:
+    try:
+        content = _invoke_llm(llm, _summary_prompt(tender_details, company_profile))
         return content.strip()
     except:
-        return f"Application summary for {company_profile.get('company_name', 'Company')} applying to {tender_details.get('title', 'tender')}. Manual completion required."
+        return _summary_fallback(tender_details, company_profile)
+
+
+def _tender_json(tender: Dict) -> str:
+    # Deterministic and easier for the model to read than a Python repr
+    return orjson.dumps(tender, default=str).decode()
 
 
-def load_and_parse_pdf(pdf_url: str) -> str:
+def _parsed_from_scrape(tender: Dict) -> Dict:
+    # A scraped stub carries nothing an extraction call could add to
+    return {
+        "title": tender.get("title"),
+        "description": tender.get("title", ""),
+        "deadline": tender.get("deadline"),
+        "budget_range": None,
+        "eligibility_criteria": None,
+        "application_requirements": None,
+        "contact_details": None,
+        "tender_id": None,
+    }
+
+
+def _analysis_prompt(document: str, user_profile: Dict) -> str:
+    return _checked(f"""
+    Analyze this tender for the company below in one pass: assess whether the
+    company is eligible, and write the application summary.
+    
+    TENDER DOCUMENT:
+    {_fit(document, DOCUMENT_TOKENS)}
+    
+    COMPANY PROFILE:
+    - Name: {_fit(user_profile.get('company_name', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Industry: {_fit(user_profile.get('industry', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Location: {_fit(user_profile.get('location', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Budget: {_fit(user_profile.get('budget_range', 'N/A'), PROFILE_FIELD_TOKENS)}
+    - Keywords: {_fit(user_profile.get('keywords', []), KEYWORDS_TOKENS)}
+    """)
+
+
+# Claude on OpenRouter supports tool calling but not OpenAI's json_schema mode
+_assessment_llm = llm.with_structured_output(TenderAssessment, method="function_calling")
+
+
+async def _process_tender(tender: Dict, user_profile: Dict):
+    # The assessment call only judges eligibility and writes the summary.
+    # Scraped stubs are described by their scrape dict, tender PDFs by the
+    # fields parsed from every page of the document, and any other document
+    # by its text
+    parsed_tender = _parsed_from_scrape(tender)
+    full_text = tender.get("full_text")
+    link = tender.get("link", "")
+    if not full_text and link.lower().endswith(".pdf"):
+        parsed_pdf = await parse_tender_pdf(link)
+        if parsed_pdf:
+            parsed_tender.update(
+                (key, _fit(value, CRITERIA_TOKENS) if key in _MERGED_FIELDS else value)
+                for key, value in parsed_pdf.items()
+            )
+
+    document = full_text or _tender_json(parsed_tender)
+
+    # Eligibility and summary share one request instead of separate calls.
+    # Only a reply that can't be read as an assessment falls back to the stub;
+    # API errors, once _llm_retry gives up, surface to the caller
     try:
-        loader = WebBaseLoader(pdf_url)
-        docs = loader.load()
+        analysis = await _ainvoke_llm(_assessment_llm, _analysis_prompt(document, user_profile))
+    except (OutputParserException, ValidationError):
+        analysis = None
 
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000, chunk_overlap=200
-        )
-        splits = text_splitter.split_documents(docs)
+    if analysis is None:
+        return _eligibility_fallback(), _summary_fallback(parsed_tender, user_profile)
 
-        content = ""
-        for split in splits[:5]:
-            content += split.page_content + "\n"
+    eligibility = analysis.eligibility.model_dump()
+    if not eligibility["eligible"]:
+        return eligibility, None
 
-        return content
-    except:
-        return "Unable to load PDF content. Manual review required."
+    return eligibility, analysis.application_summary.strip()
+
+
+async def _process_tenders(tenders: List[Dict], user_profile: Dict) -> List:
+    return await asyncio.gather(
+        *(_process_tender(tender, user_profile) for tender in tenders)
+    )
+
+
+def _open_pdf(pdf_url: str):
+    response = _CLIENT.get(pdf_url, timeout=15, follow_redirects=True)
+    response.raise_for_status()
+    return fitz.open(stream=response.content, filetype="pdf")
+
+
+# Fields that can appear anywhere in a long tender and are gathered from every
+# chunk; every other field takes the first value any chunk reports
+_MERGED_FIELDS = ("eligibility_criteria", "application_requirements")
+
+
+def _split_pdf(doc, pages_per_chunk: int = 32):
+    for start in range(0, doc.page_count, pages_per_chunk):
+        yield range(start, min(start + pages_per_chunk, doc.page_count))
+
+
+async def _parse_chunk(text: str) -> Optional[Dict]:
+    try:
+        response = await _ainvoke_llm(llm_fast, _parse_tender_prompt(text, max_chars=None))
+        content = response.content if hasattr(response, 'content') else str(response)
+        return orjson.loads(content)
+    except Exception:
+        return None
+
+
+def _merge_parsed(parsed_chunks: List[Dict]) -> Dict:
+    # Fills the same string fields as _parsed_from_scrape (title, deadline,
+    # eligibility_criteria, ...), so list answers and gathered fields are
+    # joined line by line rather than returned as lists
+    merged = {}
+    gathered = {}
+    for parsed in parsed_chunks:
+        for key, value in parsed.items():
+            values = [str(v) for v in value if v] if isinstance(value, list) else [value]
+            values = [v for v in values if v not in (None, "")]
+            if not values:
+                continue
+            if key in _MERGED_FIELDS:
+                parts = gathered.setdefault(key, [])
+                parts.extend(v for v in values if v not in parts)
+            elif key not in merged:
+                merged[key] = "\n".join(values) if isinstance(value, list) else value
+    merged.update({key: "\n".join(parts) for key, parts in gathered.items()})
+    return merged
+
+
+async def _parse_chunks(chunks: List[str]) -> List[Optional[Dict]]:
+    return await asyncio.gather(*(_parse_chunk(chunk) for chunk in chunks))
+
+
+def _pdf_chunks(pdf_url: str, pages_per_chunk: int) -> List[str]:
+    with _open_pdf(pdf_url) as doc:
+        return [
+            "\n".join(doc[i].get_text("text") for i in pages)
+            for pages in _split_pdf(doc, pages_per_chunk)
+        ]
+
+
+async def parse_tender_pdf(pdf_url: str, pages_per_chunk: int = 32) -> Optional[Dict]:
+    # Covers the whole document instead of a prefix: the PDF is cut into page
+    # groups that are parsed concurrently and merged field by field. Awaited
+    # on _IO_LOOP, where the LLM slots live; None if nothing could be parsed
+    try:
+        chunks = await asyncio.to_thread(_pdf_chunks, pdf_url, pages_per_chunk)
+    except Exception:
+        return None
+
+    parsed_chunks = [p for p in await _parse_chunks(chunks) if isinstance(p, dict)]
+    if not parsed_chunks:
+        return None
+
+    return _merge_parsed(parsed_chunks)
+
+
+# How often a query got only sample or error stubs back from the scraper, so a
+# broken portal or browser shows up as a rising count rather than bland output
+agent_stats = {"fallback_hits": 0}
+_agent_stats_lock = threading.Lock()
+
+
+def _is_stub(tender: Dict) -> bool:
+    return "note" in tender or "error" in tender
+
+
+NEXT_STEPS = """1. Visit the portal links to get complete tender documents
+2. Review eligibility criteria carefully
+3. Prepare required documents
+4. Submit before deadline"""
+
+
+def _render_fallback(tenders: List[Dict], user_profile: Dict) -> str:
+    portals = "\n".join(
+        f"- {tender['source']}: {tender['link']}"
+        for tender in {t["link"]: t for t in tenders}.values()
+    )
+    return f"""
+TENDER SEARCH RESULTS FOR: {user_profile.get('company_name', 'Your Company')}
+INDUSTRY: {user_profile.get('industry', 'N/A')}
+LOCATION: {user_profile.get('location', 'N/A')}
+
+⚠️ Live tender listings could not be retrieved right now, so no eligibility
+analysis was run. Search these portals directly for: {', '.join(user_profile.get('keywords', []))}
+
+{portals}
+
+📋 NEXT STEPS:
+{NEXT_STEPS}
+"""
 
 
 def main_tender_agent(query: str) -> str:
@@ -463,14 +1014,20 @@ def main_tender_agent(query: str) -> str:
     if not tenders:
         return f"No tenders found for keywords: {keywords}. Try different search terms."
 
-    results = []
-    for i, tender in enumerate(tenders[:3]):
-        parsed_tender = parse_tender_document(str(tender))
-        eligibility = check_eligibility(parsed_tender, user_profile)
+    # Sample/error stubs carry nothing to analyze; don't spend LLM calls on them,
+    # and only fall back to the portal list when no real listing is left
+    live_tenders = [tender for tender in tenders if not _is_stub(tender)][:3]
+    if not live_tenders:
+        with _agent_stats_lock:
+            agent_stats["fallback_hits"] += 1
+        return _render_fallback(tenders, user_profile)
 
-        if eligibility.get("eligible", True):
-            app_summary = generate_application_summary(parsed_tender, user_profile)
+    # The per-tender LLM chains run concurrently instead of one after another
+    processed = _run_on_io_loop(_process_tenders(live_tenders, user_profile))
 
+    results = []
+    for i, (tender, (eligibility, app_summary)) in enumerate(zip(live_tenders, processed)):
+        if app_summary is not None:
             result = f"""
 TENDER {i+1}: {tender['title']}
 SOURCE: {tender['source']}
@@ -499,10 +1056,7 @@ LOCATION: {user_profile.get('location', 'N/A')}
 {''.join(results)}
 
 📋 NEXT STEPS:
-1. Visit the portal links to get complete tender documents
-2. Review eligibility criteria carefully
-3. Prepare required documents
-4. Submit before deadline
+{NEXT_STEPS}
 """
 
 
@@ -543,24 +1097,23 @@ application_tool = StructuredTool.from_function(
 
 tools = [profile_tool, scrape_tool, parse_tool, eligibility_tool, application_tool]
 
-# Initialize chat message history
-chat_history = ChatMessageHistory()
+# Tool-calling agent for freeform, exploratory questions only. The standard
+# search flow is a fixed pipeline, so main_tender_agent runs it directly and
+# skips the per-step planning calls. Conversation memory is kept per thread_id
+agent = create_react_agent(agent_llm, tools, checkpointer=MemorySaver())
 
-# Initialize memory with the updated format
-memory = ConversationBufferMemory(
-    chat_memory=chat_history,
-    memory_key="chat_history",
-    return_messages=True
-)
 
-agent = initialize_agent(
-    tools,
-    llm,
-    agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-    memory=memory,
-    verbose=True,
-    handle_parsing_errors=True,
-)
+def ask_agent(query: str, thread_id: str = "default") -> str:
+    result = agent.invoke(
+        {"messages": [("user", query)]},
+        config={"configurable": {"thread_id": thread_id}},
+    )
+    return result["messages"][-1].content
+
+# Off by default so importing main for its helpers doesn't start a browser;
+# streamlit_app.py warms up explicitly
+if os.getenv("TENDER_WARM_BROWSER", "0") == "1":
+    warm_up_browser()
 
 if __name__ == "__main__":
     print("🤖 Government Tender AI Agent Started!")
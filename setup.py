@@ -15,6 +15,14 @@ setup(
         "streamlit>=1.38.0",
         "pydantic>=2.0.0",
         "requests>=2.32.4",
+        "httpx[http2]>=0.28.1",
+        "tenacity>=9.1.2",
+        "openai>=1.86.0,<2.0.0",
+        "tiktoken>=0.9.0,<0.10",
+        "selectolax>=0.3.29,<0.4",
+        "pymupdf>=1.25.5,<1.26",
+        "orjson>=3.10.18,<4",
+        "langgraph>=0.2.76,<0.3",
     ],
     python_requires=">=3.10",
     entry_points={
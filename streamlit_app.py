@@ -1,5 +1,5 @@
 import streamlit as st
-from main import main_tender_agent
+from main import main_tender_agent, warm_up_browser
 import os
 from dotenv import load_dotenv
 
@@ -21,6 +21,15 @@ if not os.getenv("OPENROUTER_API_KEY"):
     st.error("⚠️ OpenRouter API key not found. Please make sure your .env file contains OPENROUTER_API_KEY.")
     st.stop()
 
+
+@st.cache_resource
+def warm_browser():
+    # Once per server process: Chromium starts while the page renders
+    return warm_up_browser()
+
+
+warm_browser()
+
 # Set up the sidebar
 st.sidebar.title("🤖 Government Tender Agent")
 st.sidebar.image("https://img.icons8.com/color/96/000000/government.png", width=100)